@@ -156,6 +156,10 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Comments older than this are moved to compressed archive files by `manage.py archive_comments`
+COMMENT_ARCHIVE_ROOT = BASE_DIR / 'archive' / 'comments'
+COMMENT_ARCHIVE_AFTER_DAYS = 365
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
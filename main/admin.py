@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Course, Lesson, Comment
+from .models import Course, Lesson, Comment, CommentArchive
 
 """
 Customizing admin panel for better usability and control
@@ -32,6 +32,21 @@ class CommentAdmin(admin.ModelAdmin):
     list_filter = ('liked', 'created_at', 'lesson')
     ordering = ('-created_at',)
 
+class CommentArchiveAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the comment archive manifest.
+    """
+    list_display = ('lesson', 'path', 'count', 'oldest_at', 'newest_at', 'created_at')
+    list_filter = ('lesson',)
+    ordering = ('lesson', 'first_comment_id')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 admin.site.register(Course, CourseAdmin)
 admin.site.register(Lesson, LessonAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(CommentArchive, CommentArchiveAdmin)
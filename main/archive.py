@@ -0,0 +1,139 @@
+import gzip
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from .models import Comment, CommentArchive
+
+"""
+Hot/cold storage for comments: old comments are moved out of the Comment table
+into gzipped JSON-lines files, one manifest row per file.
+"""
+
+ARCHIVE_FIELDS = ('id', 'lesson_id', 'author_id', 'content', 'liked', 'created_at')
+
+
+def archive_root():
+    """
+    Directory the archive files live in.
+    """
+    return Path(getattr(settings, 'COMMENT_ARCHIVE_ROOT', settings.BASE_DIR / 'archive' / 'comments'))
+
+
+def archive_lesson_chunk(lesson_id, cutoff, chunk_size):
+    """
+    Move up to `chunk_size` comments of a lesson created before `cutoff` into a
+    new archive file in a single transaction. Returns the number of comments moved.
+    """
+    with transaction.atomic():
+        rows = list(
+            Comment.objects.select_for_update()
+            .filter(lesson_id=lesson_id, created_at__lt=cutoff)
+            .order_by('id')
+            .values(*ARCHIVE_FIELDS)[:chunk_size]
+        )
+        if not rows:
+            return 0
+
+        relative_path = Path(str(lesson_id)) / f'{rows[0]["id"]}-{rows[-1]["id"]}.jsonl.gz'
+        path = archive_root() / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(_write_rows(path, rows), path)
+            CommentArchive.objects.create(
+                lesson_id=lesson_id,
+                path=relative_path.as_posix(),
+                first_comment_id=rows[0]['id'],
+                last_comment_id=rows[-1]['id'],
+                oldest_at=min(row['created_at'] for row in rows),
+                newest_at=max(row['created_at'] for row in rows),
+                count=len(rows),
+                author_ids=sorted({row['author_id'] for row in rows}),
+            )
+            Comment.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+    return len(rows)
+
+
+def _write_rows(path, rows):
+    """
+    Write rows next to `path` and return the temporary file, for the caller to move into place.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as fh:
+        for row in rows:
+            fh.write(json.dumps({**row, 'created_at': row['created_at'].isoformat()}) + '\n')
+    return tmp_path
+
+
+def _read_rows(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as fh:
+        rows = [json.loads(line) for line in fh]
+    for row in rows:
+        row['created_at'] = parse_datetime(row['created_at'])
+    return rows
+
+
+def purge_author(author_id):
+    """
+    Remove every archived comment written by `author_id`; runs when the user is deleted.
+    Only files that may contain the author are read. This is the only operation that
+    rewrites archive files. Returns the number of comments removed.
+    """
+    # Filtered in Python: JSONField containment lookups aren't available on every backend
+    manifest_ids = [
+        manifest_id
+        for manifest_id, author_ids in CommentArchive.objects.values_list('id', 'author_ids')
+        if author_ids is None or author_id in author_ids
+    ]
+    removed = 0
+    for manifest_id in manifest_ids:
+        with transaction.atomic():
+            manifest = CommentArchive.objects.select_for_update().get(id=manifest_id)
+            path = archive_root() / manifest.path
+            rows = _read_rows(path)
+            kept = [row for row in rows if row['author_id'] != author_id]
+            if len(kept) == len(rows):
+                continue
+            removed += len(rows) - len(kept)
+            if not kept:
+                manifest.delete()
+                continue
+            manifest.first_comment_id = kept[0]['id']
+            manifest.last_comment_id = kept[-1]['id']
+            manifest.oldest_at = min(row['created_at'] for row in kept)
+            manifest.newest_at = max(row['created_at'] for row in kept)
+            manifest.count = len(kept)
+            manifest.author_ids = sorted({row['author_id'] for row in kept})
+            manifest.save()
+            tmp_path = _write_rows(path, kept)
+            transaction.on_commit(lambda tmp_path=tmp_path, path=path: os.replace(tmp_path, path))
+    return removed
+
+
+def read_archived_comments(manifests, offset, limit, reverse=False):
+    """
+    Return `limit` archived comments starting at `offset` across the given manifests,
+    as unsaved Comment instances, oldest first or newest first when `reverse` is set.
+    Only the files covering the window are opened.
+    """
+    if reverse:
+        manifests = reversed(manifests)
+    comments = []
+    for manifest in manifests:
+        if len(comments) >= limit:
+            break
+        if offset >= manifest.count:
+            offset -= manifest.count
+            continue
+        rows = _read_rows(archive_root() / manifest.path)
+        if reverse:
+            rows.reverse()
+        comments.extend(Comment(**row) for row in rows[offset:offset + limit - len(comments)])
+        offset = 0
+    return comments
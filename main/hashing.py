@@ -0,0 +1,18 @@
+import django
+from django.contrib.auth.hashers import make_password
+
+"""
+Password hashing for import worker processes. This module must not import models:
+spawn and forkserver workers import it before Django is set up.
+"""
+
+
+def setup_worker():
+    """
+    Set up Django in a freshly started worker process.
+    """
+    django.setup()
+
+
+def hash_password(password):
+    return make_password(password)
@@ -0,0 +1,232 @@
+import csv
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from rest_framework.authtoken.models import Token
+from .hashing import hash_password, setup_worker
+from .models import Course, ImportCheckpoint, Lesson
+
+"""
+Bulk import of users, courses and lessons from CSV or JSON-lines files.
+Rows are streamed, validated and inserted batch by batch, each batch in its own transaction.
+"""
+
+REQUIRED_FIELDS = {
+    'users': ('username', 'password'),
+    'courses': ('title', 'description', 'instructor'),
+    'lessons': ('course', 'title', 'video'),
+}
+
+# Yielded by read_rows in place of a line that isn't valid JSON
+INVALID_JSON = object()
+
+
+def read_rows(path):
+    """
+    Stream rows of a .csv or .jsonl file as dicts.
+    """
+    path = Path(path)
+    with path.open(newline='', encoding='utf-8') as fh:
+        if path.suffix == '.csv':
+            yield from csv.DictReader(fh)
+        elif path.suffix in ('.jsonl', '.ndjson'):
+            for line in fh:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        yield INVALID_JSON
+        else:
+            raise ValueError(f'Unsupported file type "{path.suffix}", expected .csv or .jsonl')
+
+
+def _valid_rows(kind, rows, errors):
+    """
+    Drop rows that aren't objects or miss required fields, recording why.
+    """
+    valid = []
+    for line, row in rows:
+        if row is INVALID_JSON:
+            errors.append(f'row {line}: invalid JSON')
+            continue
+        if not isinstance(row, dict):
+            errors.append(f'row {line}: not a JSON object')
+            continue
+        missing = [field for field in REQUIRED_FIELDS[kind] if not str(row.get(field) or '').strip()]
+        if missing:
+            errors.append(f'row {line}: missing {", ".join(missing)}')
+        else:
+            valid.append((line, row))
+    return valid
+
+
+def _cleaned(objs, errors, exclude):
+    """
+    Validate every field of the unsaved objects, given as (line, obj) pairs, and
+    return the valid ones. Rows repeating an id already seen in the batch are rejected.
+    """
+    valid = []
+    seen_ids = set()
+    for line, obj in objs:
+        try:
+            obj.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+        except ValidationError as exc:
+            messages = '; '.join(f'{field}: {" ".join(field_errors)}' for field, field_errors in exc.message_dict.items())
+            errors.append(f'row {line}: {messages}')
+            continue
+        if obj.pk is not None:
+            if obj.pk in seen_ids:
+                errors.append(f'row {line}: duplicate id {obj.pk}')
+                continue
+            seen_ids.add(obj.pk)
+        valid.append(obj)
+    return valid
+
+
+def import_users(rows, executor, errors):
+    """
+    Create users and their tokens. Existing usernames are skipped before hashing.
+    Returns the number of users created.
+    """
+    rows = _valid_rows('users', rows, errors)
+    usernames = [str(row['username']) for _, row in rows]
+    existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    new_rows = {}
+    for username, (line, row) in zip(usernames, rows):
+        if username in new_rows:
+            errors.append(f'row {line}: duplicate username "{username}"')
+        elif username not in existing:
+            new_rows[username] = (line, row)
+    users = _cleaned(
+        [(line, User(username=username, email=row.get('email') or '')) for username, (line, row) in new_rows.items()],
+        errors,
+        exclude=['password'],
+    )
+    passwords = executor.map(hash_password, [str(new_rows[user.username][1]['password']) for user in users], chunksize=64)
+    for user, password in zip(users, passwords):
+        user.password = password
+
+    User.objects.bulk_create(users, ignore_conflicts=True)
+    # Users inserted concurrently by someone else already have a token
+    created_ids = list(User.objects.filter(
+        username__in=[user.username for user in users], auth_token__isnull=True,
+    ).values_list('id', flat=True))
+    Token.objects.bulk_create(
+        [Token(key=Token.generate_key(), user_id=user_id) for user_id in created_ids],
+        ignore_conflicts=True,
+    )
+    return len(created_ids)
+
+
+def import_courses(rows, executor, errors):
+    """
+    Create courses, or update them in place when an `id` column is given.
+    The `instructor` column holds a username.
+    """
+    rows = _valid_rows('courses', rows, errors)
+    instructors = dict(User.objects.filter(
+        username__in={str(row['instructor']) for _, row in rows},
+    ).values_list('username', 'id'))
+    courses = []
+    for line, row in rows:
+        if str(row['instructor']) not in instructors:
+            errors.append(f'row {line}: unknown instructor "{row["instructor"]}"')
+            continue
+        courses.append((line, Course(
+            id=row.get('id') or None,
+            title=row['title'],
+            description=row['description'],
+            category=row.get('category') or None,
+            instructor_id=instructors[str(row['instructor'])],
+        )))
+    courses = _cleaned(courses, errors, exclude=['instructor'])
+    _upsert(Course, courses, ['title', 'description', 'category', 'instructor', 'updated_at'])
+    return len(courses)
+
+
+def import_lessons(rows, executor, errors):
+    """
+    Create lessons, or update them in place when an `id` column is given.
+    The `course` column holds a course id.
+    """
+    rows = _valid_rows('lessons', rows, errors)
+    course_ids = set(Course.objects.filter(
+        id__in={int(row['course']) for _, row in rows if str(row['course']).isdigit()},
+    ).values_list('id', flat=True))
+    lessons = []
+    for line, row in rows:
+        if not str(row['course']).isdigit() or int(row['course']) not in course_ids:
+            errors.append(f'row {line}: unknown course "{row["course"]}"')
+            continue
+        lessons.append((line, Lesson(
+            id=row.get('id') or None,
+            course_id=int(row['course']),
+            title=row['title'],
+            video=row['video'],
+        )))
+    lessons = _cleaned(lessons, errors, exclude=['course'])
+    _upsert(Lesson, lessons, ['course', 'title', 'video'])
+    return len(lessons)
+
+
+def _upsert(model, objs, update_fields):
+    """
+    Insert objects without an id and upsert the ones that carry one.
+    """
+    with_pk = [obj for obj in objs if obj.pk is not None]
+    without_pk = [obj for obj in objs if obj.pk is None]
+    model.objects.bulk_create(without_pk)
+    if with_pk:
+        model.objects.bulk_create(with_pk, update_conflicts=True, unique_fields=['id'], update_fields=update_fields)
+
+
+IMPORTERS = {
+    'users': import_users,
+    'courses': import_courses,
+    'lessons': import_lessons,
+}
+
+
+def import_file(kind, path, batch_size=1000, workers=None, restart=False, on_batch=None, executor=None):
+    """
+    Import every row of `path` as `kind`, resuming after the rows committed by an
+    earlier interrupted run unless `restart` is set. Passwords are hashed in a process
+    pool of `workers` processes unless an `executor` is given.
+    Returns a dict with the number of rows read, imported and the validation errors.
+    """
+    importer = IMPORTERS[kind]
+    source = str(Path(path).resolve())
+    key = {'kind': kind, 'source_hash': hashlib.sha256(source.encode()).hexdigest()}
+    if restart:
+        ImportCheckpoint.objects.filter(**key).delete()
+    checkpoint = ImportCheckpoint.objects.filter(**key).first()
+    done = checkpoint.rows if checkpoint else 0
+    rows = islice(enumerate(read_rows(path), start=1), done, None)
+    stats = {'read': 0, 'imported': 0, 'errors': []}
+
+    if executor is None:
+        # Workers only hash passwords; don't let them inherit open database connections.
+        # Closing them inside an atomic block would break the enclosing transaction.
+        if not transaction.get_connection().in_atomic_block:
+            connections.close_all()
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=setup_worker)
+    else:
+        pool = nullcontext(executor)
+    with pool as executor:
+        while batch := list(islice(rows, batch_size)):
+            with transaction.atomic():
+                stats['imported'] += importer(batch, executor, stats['errors'])
+                ImportCheckpoint.objects.update_or_create(**key, defaults={'source': source, 'rows': batch[-1][0]})
+            stats['read'] += len(batch)
+            if on_batch:
+                on_batch(stats)
+
+    ImportCheckpoint.objects.filter(**key).delete()
+    return stats
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from main.archive import archive_lesson_chunk
+from main.models import Comment
+
+
+class Command(BaseCommand):
+    """
+    Move comments older than a cutoff out of the Comment table into the archive.
+    """
+    help = 'Archive old comments into compressed, append-only files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.COMMENT_ARCHIVE_AFTER_DAYS,
+                            help='Archive comments older than this many days.')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Number of comments moved per transaction and file.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        lesson_ids = (
+            Comment.objects.filter(created_at__lt=cutoff)
+            .order_by('lesson_id')
+            .values_list('lesson_id', flat=True)
+            .distinct()
+        )
+        total = 0
+        for lesson_id in list(lesson_ids):
+            while True:
+                moved = archive_lesson_chunk(lesson_id, cutoff, options['chunk_size'])
+                if not moved:
+                    break
+                total += moved
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} comments older than {cutoff:%Y-%m-%d}.'))
@@ -0,0 +1,73 @@
+import sys
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand, CommandError
+from main.importer import IMPORTERS, import_file
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mib(who):
+    """
+    Peak resident set size in MiB of this process (RUSAGE_SELF) or of its
+    finished worker processes (RUSAGE_CHILDREN), or None where unsupported.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+class Command(BaseCommand):
+    """
+    Bulk import users, courses or lessons from a CSV or JSON-lines file.
+    """
+    help = 'Import users, courses or lessons from a .csv or .jsonl file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path', help='Path to a .csv or .jsonl file.')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of rows validated and inserted per transaction.')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Number of processes hashing passwords (default: CPU count).')
+        parser.add_argument('--restart', action='store_true',
+                            help='Start from the first row even if an earlier import of this file was interrupted.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        def report(stats):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'{stats["read"]} rows read, {stats["read"] / elapsed:.0f} rows/sec')
+
+        try:
+            stats = import_file(
+                options['kind'],
+                options['path'],
+                batch_size=options['batch_size'],
+                workers=options['workers'],
+                restart=options['restart'],
+                on_batch=report,
+            )
+        except (OSError, ValueError) as exc:
+            raise CommandError(exc)
+        except BrokenProcessPool as exc:
+            raise CommandError(f'Password hashing worker died: {exc}')
+
+        elapsed = time.perf_counter() - started
+        for error in stats['errors']:
+            self.stderr.write(error)
+        summary = f'Imported {stats["imported"]} of {stats["read"]} {options["kind"]} in {elapsed:.1f}s ({stats["read"] / elapsed:.0f} rows/sec'
+        if resource is not None:
+            # The hashing workers have exited by now, so RUSAGE_CHILDREN covers them
+            summary += (
+                f', peak RSS {peak_rss_mib(resource.RUSAGE_SELF):.1f} MiB'
+                f', largest worker {peak_rss_mib(resource.RUSAGE_CHILDREN):.1f} MiB'
+            )
+        self.stdout.write(self.style.SUCCESS(summary + ').'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from main.archive import purge_author
+
+
+class Command(BaseCommand):
+    """
+    Remove archived comments of the given users. Deleting a user already does this;
+    the command covers users deleted with signals bypassed, e.g. by raw SQL.
+    """
+    help = 'Remove archived comments written by the given user ids.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('user_ids', nargs='+', type=int)
+
+    def handle(self, *args, **options):
+        for user_id in options['user_ids']:
+            removed = purge_author(user_id)
+            self.stdout.write(self.style.SUCCESS(f'Removed {removed} archived comments of user {user_id}.'))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_alter_comment_liked'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=255, unique=True)),
+                ('first_comment_id', models.BigIntegerField()),
+                ('last_comment_id', models.BigIntegerField()),
+                ('oldest_at', models.DateTimeField()),
+                ('newest_at', models.DateTimeField()),
+                ('count', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comment_archives', to='main.lesson')),
+            ],
+            options={
+                'ordering': ['lesson', 'first_comment_id'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commentarchive',
+            name='author_ids',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
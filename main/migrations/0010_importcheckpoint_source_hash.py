@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:05
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_sources(apps, schema_editor):
+    ImportCheckpoint = apps.get_model('main', 'ImportCheckpoint')
+    for checkpoint in ImportCheckpoint.objects.all():
+        checkpoint.source_hash = hashlib.sha256(checkpoint.source.encode()).hexdigest()
+        checkpoint.save(update_fields=['source_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_commentarchive_author_ids'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='importcheckpoint',
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name='importcheckpoint',
+            name='source',
+            field=models.TextField(),
+        ),
+        migrations.AddField(
+            model_name='importcheckpoint',
+            name='source_hash',
+            field=models.CharField(default='', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(hash_sources, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='importcheckpoint',
+            unique_together={('kind', 'source_hash')},
+        ),
+    ]
@@ -46,3 +46,45 @@ class Comment(models.Model):
 
     def __str__(self):
         return f'Comment by {self.author} on lesson {self.lesson.title}'
+
+
+class CommentArchive(models.Model):
+    """
+    Manifest entry for a compressed, append-only chunk of archived comments of a lesson.
+    Deleting an entry removes its file. Deleting a user removes their archived comments
+    from the files listed with their id in `author_ids` (null: unknown, the file is read).
+    """
+    lesson = models.ForeignKey(Lesson, related_name='comment_archives', on_delete=models.CASCADE)
+    path = models.CharField(max_length=255, unique=True)
+    first_comment_id = models.BigIntegerField()
+    last_comment_id = models.BigIntegerField()
+    oldest_at = models.DateTimeField()
+    newest_at = models.DateTimeField()
+    count = models.PositiveIntegerField()
+    author_ids = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['lesson', 'first_comment_id']
+
+    def __str__(self):
+        return f'{self.count} archived comments on lesson {self.lesson_id}'
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Number of source rows `manage.py import_erp` has committed for a file,
+    saved in the same transaction as each batch so a resumed import never repeats one.
+    Paths can be of any length, so uniqueness is on the sha256 of `source`.
+    """
+    kind = models.CharField(max_length=20)
+    source = models.TextField()
+    source_hash = models.CharField(max_length=64)
+    rows = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'source_hash')
+
+    def __str__(self):
+        return f'{self.kind} from {self.source}: {self.rows} rows'
@@ -0,0 +1,94 @@
+import math
+
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .archive import read_archived_comments
+from .models import CommentArchive
+from .permissions import is_mine
+
+
+class CommentArchivePagination(PageNumberPagination):
+    """
+    Page number pagination for comments of a lesson that also covers its archived
+    comments, placed before the hot ones when ordered by `created_at` and after
+    them when ordered by `-created_at`. Archived comments can't be searched or
+    filtered by owner, so `search` and `mine=true` lists leave them out.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        lesson_id = request.query_params.get('lesson', '')
+        self.manifests = []
+        if lesson_id.isdigit() and not request.query_params.get('search') and not is_mine(request):
+            self.manifests = list(CommentArchive.objects.filter(lesson_id=lesson_id))
+        self.archived_count = sum(manifest.count for manifest in self.manifests)
+        if not self.archived_count:
+            page = super().paginate_queryset(queryset, request, view)
+            if page is not None:
+                self.count = self.page.paginator.count
+                self.number = self.page.number
+                self.num_pages = self.page.paginator.num_pages
+            return page
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        ordering = tuple(queryset.query.order_by)
+        if ordering not in (('created_at',), ('-created_at',)):
+            raise ValidationError({'ordering': 'Archived comments can only be ordered by created_at.'})
+        newest_first = ordering == ('-created_at',)
+
+        hot_count = queryset.count()
+        self.count = hot_count + self.archived_count
+        self.num_pages = max(math.ceil(self.count / page_size), 1)
+        page_number = request.query_params.get(self.page_query_param) or 1
+        if page_number in self.last_page_strings:
+            page_number = self.num_pages
+        try:
+            self.number = int(page_number)
+        except ValueError:
+            self.number = 0
+        if not 1 <= self.number <= self.num_pages:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message='That page contains no results'))
+
+        # Archived comments are older than every hot one: they come first oldest-first
+        # and last newest-first. A page may span both segments.
+        start = (self.number - 1) * page_size
+        end = start + page_size
+        if newest_first:
+            hot = list(queryset[start:min(end, hot_count)]) if start < hot_count else []
+            archived_start = max(start - hot_count, 0)
+            archived = read_archived_comments(self.manifests, archived_start, page_size - len(hot), reverse=True)
+            return hot + archived
+        archived = []
+        if start < self.archived_count:
+            archived = read_archived_comments(self.manifests, start, page_size)
+        hot_start = max(start - self.archived_count, 0)
+        hot_end = end - self.archived_count
+        hot = list(queryset[hot_start:hot_end]) if hot_end > 0 else []
+        return archived + hot
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if self.number >= self.num_pages:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.number + 1)
+
+    def get_previous_link(self):
+        if self.number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.number - 1)
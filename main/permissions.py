@@ -1,12 +1,74 @@
-from rest_framework.permissions import BasePermission
+from functools import reduce
+
+from django.db.models import F
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.permissions import BasePermission, SAFE_METHODS
+from .models import Course, Lesson, Comment
+
+"""
+Ownership rules. Every model declares the lookup leading to its owner's user id,
+so ownership can be checked on an instance or applied to a queryset as a filter.
+"""
+
+OWNER_FIELDS = {
+    Course: 'instructor_id',
+    Lesson: 'course__instructor_id',
+    Comment: 'author_id',
+}
+
+
+def with_owner(queryset):
+    """
+    Annotate `owner_id` on querysets whose owner lives on a related model,
+    so object checks don't need to load the relation.
+    """
+    field = OWNER_FIELDS[queryset.model]
+    if '__' in field:
+        return queryset.annotate(owner_id=F(field))
+    return queryset
+
+
+def owned_by(queryset, user):
+    """
+    Restrict a queryset to the rows owned by `user` with a single SQL predicate.
+    """
+    return queryset.filter(**{OWNER_FIELDS[queryset.model]: user.id})
+
+
+def is_mine(request):
+    """
+    Whether the request asks for the user's own rows only (`?mine=true`).
+    """
+    return request.query_params.get('mine', '').lower() in ('1', 'true', 'yes')
+
+
+def get_owner_id(obj):
+    """
+    Id of the user owning `obj`, or None for models without an owner.
+    """
+    field = OWNER_FIELDS.get(type(obj))
+    if field is None:
+        return None
+    if '__' in field and hasattr(obj, 'owner_id'):
+        return obj.owner_id
+    return reduce(getattr, field.split('__'), obj)
+
 
 class IsAuthorOrAdminOrReadOnly(BasePermission):
     """
-    Allow full access for admins and authors of the object, read-only for others.
+    Allow full access for admins and owners of the object, read-only for others.
     """
     def has_object_permission(self, request, view, obj):
-        if request.user.is_staff:
-            return True
-        if hasattr(obj, 'author') and obj.author == request.user:
+        if request.user.is_staff or request.method in SAFE_METHODS:
             return True
-        return request.method in ('GET', 'HEAD', 'OPTIONS')
+        return request.user.id is not None and get_owner_id(obj) == request.user.id
+
+
+class IsOwnerFilterBackend(BaseFilterBackend):
+    """
+    Limit the queryset to the user's own rows for `?mine=true`.
+    """
+    def filter_queryset(self, request, queryset, view):
+        if queryset.model in OWNER_FIELDS and is_mine(request):
+            return owned_by(queryset, request.user)
+        return queryset
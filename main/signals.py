@@ -0,0 +1,23 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .archive import archive_root, purge_author
+from .models import CommentArchive
+
+
+@receiver(post_delete, sender=CommentArchive)
+def remove_archive_file(sender, instance, **kwargs):
+    """
+    Remove the archive file once the deletion of its manifest entry is committed.
+    """
+    path = archive_root() / instance.path
+    transaction.on_commit(lambda: path.unlink(missing_ok=True))
+
+
+@receiver(post_delete, sender=User)
+def purge_archived_comments(sender, instance, **kwargs):
+    """
+    Archived comments don't cascade with their author like hot ones do; remove them here.
+    """
+    purge_author(instance.pk)
@@ -1,3 +1,330 @@
-from django.test import TestCase
+import hashlib
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, RequestFactory, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from . import archive
+from .archive import purge_author
+from .importer import import_file
+from .models import Course, Lesson, Comment, CommentArchive, ImportCheckpoint
+from .permissions import IsAuthorOrAdminOrReadOnly, with_owner
+
+
+class OwnershipPermissionTests(TestCase):
+    """
+    Ownership checks for courses, lessons and comments.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='pass')
+        cls.other = User.objects.create_user(username='other', password='pass')
+        cls.admin = User.objects.create_user(username='admin', password='pass', is_staff=True)
+        cls.course = Course.objects.create(title='Owned', description='d', instructor=cls.owner)
+        cls.other_course = Course.objects.create(title='Foreign', description='d', instructor=cls.other)
+        cls.lesson = Lesson.objects.create(course=cls.course, title='Lesson', video='lessons/videos/a.mp4')
+        cls.comment = Comment.objects.create(lesson=cls.lesson, author=cls.other, content='Hi')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def check(self, user, obj, method='patch'):
+        request = getattr(RequestFactory(), method)('/')
+        request.user = user
+        return IsAuthorOrAdminOrReadOnly().has_object_permission(request, None, obj)
+
+    def test_object_checks_do_not_query(self):
+        course = Course.objects.get(pk=self.course.pk)
+        lesson = with_owner(Lesson.objects.all()).get(pk=self.lesson.pk)
+        comment = Comment.objects.get(pk=self.comment.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(self.check(self.owner, course))
+            self.assertTrue(self.check(self.owner, lesson))
+            self.assertTrue(self.check(self.other, comment))
+            self.assertFalse(self.check(self.other, course))
+            self.assertFalse(self.check(self.other, lesson))
+            self.assertFalse(self.check(self.owner, comment))
+
+    def test_read_only_and_admin_access(self):
+        self.assertTrue(self.check(self.other, self.course, method='get'))
+        self.assertTrue(self.check(self.admin, self.course))
+
+    def test_update_course_as_instructor(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.patch(f'/api/v1/courses/{self.course.pk}/', {'title': 'Renamed'})
+        self.assertEqual(response.status_code, 200)
+
+        self.client.force_authenticate(self.other)
+        response = self.client.patch(f'/api/v1/courses/{self.course.pk}/', {'title': 'Stolen'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_update_lesson_as_course_instructor(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.patch(f'/api/v1/lessons/{self.lesson.pk}/', {'title': 'Renamed'})
+        self.assertEqual(response.status_code, 200)
+
+        self.client.force_authenticate(self.other)
+        response = self.client.patch(f'/api/v1/lessons/{self.lesson.pk}/', {'title': 'Stolen'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_mine_filters_in_sql(self):
+        self.client.force_authenticate(self.owner)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/courses/', {'mine': 'true'})
+        self.assertEqual([course['id'] for course in response.data['results']], [self.course.pk])
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/lessons/', {'mine': 'true'})
+        self.assertEqual([lesson['id'] for lesson in response.data['results']], [self.lesson.pk])
+
+        response = self.client.get('/api/v1/comments/', {'mine': 'true'})
+        self.assertEqual(response.data['count'], 0)
+
+    def test_list_without_mine_is_unfiltered(self):
+        self.client.force_authenticate(self.owner)
+        response = self.client.get('/api/v1/courses/')
+        self.assertEqual(response.data['count'], 2)
+
+
+class CommentArchiveTests(TestCase):
+    """
+    Moving old comments to the archive and paginating across hot and archived comments.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='pass')
+        cls.other = User.objects.create_user(username='writer', password='pass')
+        course = Course.objects.create(title='Course', description='d', instructor=cls.user)
+        cls.lesson = Lesson.objects.create(course=course, title='Lesson', video='lessons/videos/a.mp4')
+        old = timezone.now() - timedelta(days=400)
+        for i in range(5):
+            author = cls.other if i == 1 else cls.user
+            comment = Comment.objects.create(lesson=cls.lesson, author=author, content=f'old{i}')
+            Comment.objects.filter(pk=comment.pk).update(created_at=old + timedelta(minutes=i))
+        for i in range(3):
+            Comment.objects.create(lesson=cls.lesson, author=cls.user, content=f'new{i}')
+
+    def setUp(self):
+        cache.clear()
+        archive_root = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_root.cleanup)
+        self.root = Path(archive_root.name)
+        settings_override = override_settings(COMMENT_ARCHIVE_ROOT=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command('archive_comments', '--chunk-size', '2', stdout=StringIO())
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def pages(self, **params):
+        contents = []
+        url = '/api/v1/comments/'
+        params = {'lesson': self.lesson.pk, **params}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['count'], 8)
+            contents.append([comment['content'] for comment in response.data['results']])
+            url, params = response.data['next'], None
+        return contents
+
+    def test_moves_old_comments_in_chunks(self):
+        self.assertEqual(Comment.objects.count(), 3)
+        manifests = CommentArchive.objects.filter(lesson=self.lesson)
+        self.assertEqual([manifest.count for manifest in manifests], [2, 2, 1])
+        for manifest in manifests:
+            self.assertTrue((self.root / manifest.path).exists())
+
+    def test_pages_oldest_first(self):
+        self.assertEqual(self.pages(ordering='created_at'), [
+            ['old0', 'old1'], ['old2', 'old3'], ['old4', 'new0'], ['new1', 'new2'],
+        ])
+
+    def test_first_page_stays_in_hot_table(self):
+        with mock.patch.object(archive, '_read_rows') as read_rows:
+            response = self.client.get('/api/v1/comments/', {'lesson': self.lesson.pk})
+        self.assertEqual([comment['content'] for comment in response.data['results']], ['new2', 'new1'])
+        read_rows.assert_not_called()
+
+    def test_pages_newest_first(self):
+        self.assertEqual(self.pages(), [
+            ['new2', 'new1'], ['new0', 'old4'], ['old3', 'old2'], ['old1', 'old0'],
+        ])
+
+    def test_last_page_and_links(self):
+        response = self.client.get('/api/v1/comments/', {'lesson': self.lesson.pk, 'page': 'last'})
+        self.assertEqual([comment['content'] for comment in response.data['results']], ['old1', 'old0'])
+        self.assertIsNone(response.data['next'])
+        self.assertIn('page=3', response.data['previous'])
+
+        response = self.client.get('/api/v1/comments/', {'lesson': self.lesson.pk, 'page': 2})
+        self.assertIn('page=3', response.data['next'])
+        self.assertNotIn('page=', response.data['previous'])
+
+        response = self.client.get('/api/v1/comments/', {'lesson': self.lesson.pk, 'page': 5})
+        self.assertEqual(response.status_code, 404)
+
+    def test_search_skips_archive(self):
+        response = self.client.get('/api/v1/comments/', {'lesson': self.lesson.pk, 'search': 'new'})
+        self.assertEqual(response.data['count'], 3)
+        response = self.client.get(response.data['next'])
+        self.assertEqual([comment['content'] for comment in response.data['results']], ['new0'])
+        self.assertIsNone(response.data['next'])
+
+    def test_mine_skips_archive(self):
+        response = self.client.get('/api/v1/comments/', {'lesson': self.lesson.pk, 'mine': 'true'})
+        self.assertEqual(response.data['count'], 3)
+
+        response = self.client.get('/api/v1/comments/', {'lesson': self.lesson.pk, 'mine': 'false', 'page': 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 8)
+
+    def test_deleting_lesson_removes_files(self):
+        paths = [self.root / manifest.path for manifest in CommentArchive.objects.all()]
+        with self.captureOnCommitCallbacks(execute=True):
+            Lesson.objects.filter(pk=self.lesson.pk).delete()
+        self.assertFalse(any(path.exists() for path in paths))
+
+    def test_purge_author(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(purge_author(self.other.pk), 1)
+        self.assertEqual([manifest.count for manifest in CommentArchive.objects.all()], [1, 2, 1])
+        response = self.client.get('/api/v1/comments/', {'lesson': self.lesson.pk})
+        self.assertEqual(response.data['count'], 7)
+        response = self.client.get('/api/v1/comments/', {'lesson': self.lesson.pk, 'page': 'last'})
+        self.assertEqual([comment['content'] for comment in response.data['results']], ['old0'])
+
+    def test_deleting_user_purges_only_their_files(self):
+        with mock.patch.object(archive, '_read_rows', wraps=archive._read_rows) as read_rows:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.other.delete()
+        self.assertEqual(read_rows.call_count, 1)
+        self.assertEqual([manifest.count for manifest in CommentArchive.objects.all()], [1, 2, 1])
+        self.assertEqual([manifest.author_ids for manifest in CommentArchive.objects.all()], [[self.user.pk]] * 3)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImporterTests(TestCase):
+    """
+    Bulk import of users, courses and lessons with `import_file`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user(username='teacher', password='pass')
+        cls.course = Course.objects.create(title='Existing', description='d', instructor=cls.instructor)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(self.executor.shutdown)
+
+    def write(self, name, content):
+        path = self.directory / name
+        path.write_text(content)
+        return path
+
+    def checkpoint(self, path, rows):
+        source = str(path.resolve())
+        return ImportCheckpoint.objects.create(
+            kind='courses', source=source, source_hash=hashlib.sha256(source.encode()).hexdigest(), rows=rows,
+        )
+
+    def write_jsonl(self, name, rows):
+        return self.write(name, ''.join(json.dumps(row) + '\n' for row in rows))
+
+    def test_users_from_csv(self):
+        path = self.write('users.csv', (
+            'username,password,email\n'
+            'teacher,pass,\n'
+            'alice,secret,alice@example.com\n'
+            'bob,secret,not-an-email\n'
+            ',secret,\n'
+            'alice,other,\n'
+        ))
+        stats = import_file('users', path, executor=self.executor)
+
+        self.assertEqual(stats['read'], 5)
+        self.assertEqual(stats['imported'], 1)
+        self.assertEqual(len(stats['errors']), 3)
+        self.assertTrue(stats['errors'][0].startswith('row 4:'))
+        self.assertIn('row 5: duplicate username "alice"', stats['errors'])
+        alice = User.objects.get(username='alice')
+        self.assertTrue(alice.check_password('secret'))
+        self.assertTrue(Token.objects.filter(user=alice).exists())
+        self.assertFalse(Token.objects.filter(user=self.instructor).exists())
+        self.assertFalse(User.objects.filter(username='bob').exists())
+
+    def test_courses_from_jsonl_upsert_by_id(self):
+        path = self.write_jsonl('courses.jsonl', [
+            {'id': self.course.pk, 'title': 'Renamed', 'description': 'd', 'instructor': 'teacher'},
+            {'title': 'New', 'description': 'd', 'instructor': 'teacher', 'category': 'science'},
+            {'id': 'abc', 'title': 'Bad id', 'description': 'd', 'instructor': 'teacher'},
+            {'title': 'Nobody', 'description': 'd', 'instructor': 'ghost'},
+        ])
+        stats = import_file('courses', path, executor=self.executor)
+
+        self.assertEqual(stats['imported'], 2)
+        self.assertEqual(len(stats['errors']), 2)
+        self.assertEqual(
+            sorted(Course.objects.values_list('title', flat=True)), ['New', 'Renamed'],
+        )
+
+    def test_invalid_json_lines(self):
+        path = self.write('courses.jsonl', (
+            '{"title": "Valid", "description": "d", "instructor": "teacher"}\n'
+            '{broken\n'
+            '[1, 2]\n'
+        ))
+        stats = import_file('courses', path, executor=self.executor)
+
+        self.assertEqual(stats['imported'], 1)
+        self.assertEqual(stats['errors'], ['row 2: invalid JSON', 'row 3: not a JSON object'])
+
+    def test_lessons_with_unknown_course(self):
+        path = self.write('lessons.csv', (
+            'course,title,video\n'
+            f'{self.course.pk},Intro,lessons/videos/intro.mp4\n'
+            '999,Orphan,lessons/videos/orphan.mp4\n'
+        ))
+        stats = import_file('lessons', path, executor=self.executor)
+
+        self.assertEqual(stats['imported'], 1)
+        self.assertEqual(stats['errors'], ['row 2: unknown course "999"'])
+        self.assertEqual(list(Lesson.objects.values_list('title', flat=True)), ['Intro'])
+
+    def test_resumes_after_checkpoint(self):
+        path = self.write_jsonl('courses.jsonl', [
+            {'title': f'Course {i}', 'description': 'd', 'instructor': 'teacher'} for i in range(5)
+        ])
+        self.checkpoint(path, rows=3)
+        stats = import_file('courses', path, batch_size=1, executor=self.executor)
+
+        self.assertEqual(stats['read'], 2)
+        self.assertTrue(Course.objects.filter(title='Course 4').exists())
+        self.assertFalse(Course.objects.filter(title='Course 0').exists())
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+    def test_restart_ignores_checkpoint(self):
+        path = self.write_jsonl('courses.jsonl', [
+            {'title': f'Course {i}', 'description': 'd', 'instructor': 'teacher'} for i in range(2)
+        ])
+        self.checkpoint(path, rows=2)
+        stats = import_file('courses', path, restart=True, executor=self.executor)
+
+        self.assertEqual(stats['imported'], 2)
@@ -9,9 +9,11 @@ from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db import IntegrityError, transaction
 from .models import Course, Lesson, Comment
 from .serializers import CourseSerializer, LessonSerializer, CommentSerializer
-from .permissions import  IsAuthorOrAdminOrReadOnly
+from .permissions import  IsAuthorOrAdminOrReadOnly, IsOwnerFilterBackend, with_owner
+from .pagination import CommentArchivePagination
 
 
 class BaseViewSet(ModelViewSet):
@@ -19,7 +21,7 @@ class BaseViewSet(ModelViewSet):
     Base class for ViewSets for CRUD
     """
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [IsOwnerFilterBackend, DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
 
     def send_email(self, subject, message):
         """
@@ -63,7 +65,7 @@ class LessonViewSet(BaseViewSet):
     """
     Manage lessons: list, create, update, delete.
     """
-    queryset = Lesson.objects.all()
+    queryset = with_owner(Lesson.objects.all())
     serializer_class = LessonSerializer
     permission_classes = [IsAuthorOrAdminOrReadOnly]  
     filterset_fields = ['course', 'title']
@@ -87,14 +89,19 @@ class LessonViewSet(BaseViewSet):
 class CommentViewSet(BaseViewSet):
     """
     Manage comments: list, create, update, delete.
+    Comments are listed newest first; a lesson's list continues into its archived
+    comments past the last hot page. With `ordering=created_at` the archived ones come first.
+    `search` and `mine=true` only cover comments that haven't been archived yet
+    (see COMMENT_ARCHIVE_AFTER_DAYS), and `count` then excludes archived comments.
     """
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [IsAuthorOrAdminOrReadOnly]
+    pagination_class = CommentArchivePagination
     filterset_fields = ['lesson']
     search_fields = ['content']
     ordering_fields = ['created_at']
-    ordering = ['created_at']
+    ordering = ['-created_at']
     throttle_classes = [ScopedRateThrottle]
     throttle_scope = 'comments'
 
@@ -123,6 +130,10 @@ def register_user(request):
     if User.objects.filter(username=username).exists():
         return Response({'error': 'Username already exists'}, status=400)
 
-    user = User.objects.create_user(username=username, password=password, email=email)
-    token = Token.objects.create(user=user)
+    try:
+        with transaction.atomic():
+            user = User.objects.create_user(username=username, password=password, email=email)
+            token = Token.objects.create(user=user)
+    except IntegrityError:
+        return Response({'error': 'Username already exists'}, status=400)
     return Response({'token': token.key, 'message': 'User registered successfully'})